@@ -0,0 +1,4 @@
+'''Benchmarks for systools.
+
+Run with `python -m benchmarks.run`.
+'''
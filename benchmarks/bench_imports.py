@@ -0,0 +1,26 @@
+'''Import-time benchmarks, each import running in a fresh interpreter.
+'''
+import sys
+import subprocess
+
+from benchmarks.common import bench
+
+
+MODULES = [
+    'systools.system',
+    'systools.system.service',
+    'systools.network',
+    'systools.network.ftp',
+    'systools.network.mail',
+    ]
+NUMBER = 20
+
+
+def _import(module):
+    subprocess.check_call([sys.executable, '-c', 'import %s' % module])
+
+def run():
+    res = [bench('import (interpreter)', lambda: _import('sys'), number=NUMBER)]
+    for module in MODULES:
+        res.append(bench('import %s' % module, lambda: _import(module), number=NUMBER))
+    return res
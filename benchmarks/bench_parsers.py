@@ -0,0 +1,100 @@
+'''Micro-benchmarks for the output parsers and the JSON serializer.
+'''
+import json
+import logging
+from datetime import datetime
+
+from bson.objectid import ObjectId
+
+from systools.system import parse_ifconfig, parse_diskutil
+from systools.system.webapp import JSONSerializer, json_decoder
+
+from benchmarks.common import bench
+
+
+IFCONFIG = '''veth%(i)d: flags=4163<UP,BROADCAST,RUNNING,MULTICAST>  mtu 1500
+        inet 10.%(a)d.%(b)d.1  netmask 255.255.255.0  broadcast 10.%(a)d.%(b)d.255
+        inet6 fe80::%(i)x  prefixlen 64  scopeid 0x20<link>
+        ether 02:42:ac:%(a)02x:%(b)02x:01  txqueuelen 0  (Ethernet)
+        RX packets 1234  bytes 123456 (120.5 KiB)
+        TX packets 4321  bytes 654321 (638.9 KiB)
+'''
+DISKUTIL_LIST = '''<?xml version="1.0" encoding="UTF-8"?>
+<plist version="1.0">
+<dict>
+    <key>AllDisks</key>
+    <array>
+%s
+    </array>
+</dict>
+</plist>'''
+DISKUTIL_INFO = '''<?xml version="1.0" encoding="UTF-8"?>
+<plist version="1.0">
+<dict>
+%s
+    <key>DeviceNode</key>
+    <string>disk1s1</string>
+    <key>VolumeUUID</key>
+    <string>0A81F3B1-51D9-3335-B3E3-169C3640360D</string>
+</dict>
+</plist>'''
+SIZES = ['1024', '12.5k', '512m', '2G', '123456789b', '4096K', 'invalid', '7.25g']
+
+
+def get_ifconfig_output(count=500):
+    output = ''.join(IFCONFIG % {'i': i, 'a': i // 256, 'b': i % 256}
+            for i in range(count))
+    return output.splitlines()
+
+def get_diskutil_output(count=500):
+    list_ = DISKUTIL_LIST % '\n'.join('        <string>disk%d</string>' % i
+            for i in range(count))
+    info = DISKUTIL_INFO % '\n'.join('    <key>Key%d</key>\n    <string>%d</string>' % (i, i)
+            for i in range(count))
+    return list_, info
+
+def get_documents(count=10000):
+    now = datetime.utcnow()
+    return [{
+            '_id': ObjectId(),
+            'user': ObjectId(),
+            'users': [ObjectId() for i in range(5)],
+            'name': 'document %d' % i,
+            'tags': set(['a', 'b']),
+            'count': i,
+            'created': now,
+            'modified': now,
+            } for i in range(count)]
+
+
+def run():
+    res = []
+
+    lines = get_ifconfig_output()
+    size = sum(len(l) + 1 for l in lines)
+    res.append(bench('parse_ifconfig', lambda: parse_ifconfig(lines), size=size))
+
+    list_, info = get_diskutil_output()
+    res.append(bench('parse_diskutil list', lambda: parse_diskutil(list_, type='list'), size=len(list_)))
+    res.append(bench('parse_diskutil info', lambda: parse_diskutil(info, type='info'), size=len(info)))
+
+    try:
+        from systools.network.ssh import get_size
+    except ImportError, e:
+        logging.error('skipped get_size benchmark: %s', str(e))
+    else:
+        def get_sizes():
+            for val in SIZES:
+                get_size(val)
+
+        res.append(bench('get_size', get_sizes))
+
+    serializer = JSONSerializer()
+    docs = get_documents()
+    data = serializer.encode(docs)
+    res.append(bench('JSONSerializer.encode', lambda: serializer.encode(docs), size=len(data)))
+    res.append(bench('JSONSerializer.iter_encode', lambda: list(serializer.iter_encode(docs)), size=len(data)))
+    res.append(bench('JSONSerializer.decode', lambda: serializer.decode(data), size=len(data)))
+    res.append(bench('json_decoder', lambda: json.loads(data, object_hook=json_decoder), size=len(data)))
+
+    return res
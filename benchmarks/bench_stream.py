@@ -0,0 +1,63 @@
+'''Peak memory and time to first byte of full vs streamed JSON encoding,
+each case running in a fresh interpreter.
+'''
+import sys
+import json
+import subprocess
+
+from benchmarks.common import Result
+
+
+ROWS = 100000
+CASE = '''
+import sys
+import time
+import json
+import resource
+
+from systools.system.webapp import JSONSerializer
+
+from benchmarks.bench_parsers import get_documents
+
+
+def rows(count):
+    for i in range(count // 1000):
+        for doc in get_documents(1000):
+            yield doc
+
+mode, count = sys.argv[1], int(sys.argv[2])
+serializer = JSONSerializer()
+rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+time_start = time.time()
+ttfb = None
+size = 0
+if mode == 'stream':
+    for chunk in serializer.iter_encode(rows(count)):
+        if ttfb is None:
+            ttfb = time.time() - time_start
+        size += len(chunk)
+else:
+    data = serializer.encode(list(rows(count)))
+    ttfb = time.time() - time_start
+    size = len(data)
+duration = time.time() - time_start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_start
+print json.dumps({'duration': duration, 'ttfb': ttfb, 'size': size, 'rss_kb': rss})
+'''
+
+
+def _run_case(mode, count):
+    output = subprocess.check_output([sys.executable, '-c', CASE, mode, str(count)])
+    return json.loads(output.splitlines()[-1])
+
+def run():
+    res = []
+    for mode in ('encode', 'stream'):
+        info = _run_case(mode, ROWS)
+        res.append(Result(name='JSONSerializer %s %d rows' % (mode, ROWS),
+                number=ROWS, duration=info['duration'],
+                ops=ROWS / info['duration'],
+                mbs=info['size'] / info['duration'] / 1024 / 1024,
+                extra={'ttfb': '%.3fs' % info['ttfb'],
+                    'peak_rss': '%dMB' % (info['rss_kb'] / 1024)}))
+    return res
@@ -0,0 +1,81 @@
+'''End-to-end benchmarks for Host SFTP and Ftp against local stand-in servers.
+'''
+import os
+import shutil
+import tempfile
+import logging
+
+from systools.network.ftp import Ftp
+
+from benchmarks.common import bench
+from benchmarks.servers import (USERNAME, PASSWORD, start_sftp_server,
+        start_ftp_server)
+
+
+TREE_DIRS = 20
+TREE_FILES = 20
+FILE_SIZE = 8 * 1024 * 1024
+
+
+def make_tree(path, dirs=TREE_DIRS, files=TREE_FILES):
+    for i in range(dirs):
+        path_ = os.path.join(path, 'dir%d' % i)
+        os.makedirs(path_)
+        for j in range(files):
+            with open(os.path.join(path_, 'file%d' % j), 'wb') as fd:
+                fd.write('x' * 1024)
+
+def make_file(file, size=FILE_SIZE):
+    with open(file, 'wb') as fd:
+        fd.write(os.urandom(size))
+
+
+def run_sftp(root, local):
+    from systools.network.ssh import Host
+
+    host, port = start_sftp_server(root)
+    client = Host(host=host, port=port, username=USERNAME, password=PASSWORD)
+    src = os.path.join(local, 'src.bin')
+    dst = os.path.join(local, 'dst', 'dst.bin')
+
+    res = []
+    res.append(bench('Host.walk', lambda: list(client.walk('/tree')), number=5))
+    res.append(bench('Host.upload', lambda: client.upload(src, '/upload/file.bin'),
+            number=5, size=FILE_SIZE))
+    res.append(bench('Host.download', lambda: client.download('/upload/file.bin', dst),
+            number=5, size=FILE_SIZE))
+    return res
+
+def run_ftp(root, local):
+    host, port = start_ftp_server(root)
+    client = Ftp(host, USERNAME, PASSWORD, port=port)
+    src = os.path.join(local, 'src.bin')
+    dst = os.path.join(local, 'dst', 'dst.bin')
+
+    res = []
+    res.append(bench('Ftp.walk', lambda: list(client.walk('/tree')), number=5))
+    res.append(bench('Ftp.upload', lambda: client.upload(src, '/upload/file.bin'),
+            number=5, size=FILE_SIZE))
+    res.append(bench('Ftp.download', lambda: client.download('/upload/file.bin', dst),
+            number=5, size=FILE_SIZE))
+    client.close()
+    return res
+
+
+def run():
+    tmp = tempfile.mkdtemp(prefix='systools-bench-')
+    try:
+        root = os.path.join(tmp, 'remote')
+        local = os.path.join(tmp, 'local')
+        make_tree(os.path.join(root, 'tree'))
+        os.makedirs(local)
+        make_file(os.path.join(local, 'src.bin'))
+        res = []
+        for func in (run_sftp, run_ftp):
+            try:
+                res += func(root, local)
+            except Exception:
+                logging.exception('failed to run %s', func.__name__)
+        return res
+    finally:
+        shutil.rmtree(tmp)
@@ -0,0 +1,73 @@
+import os
+import time
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class Result(dict):
+
+    def __str__(self):
+        res = '%-40s %10.1f ops/s' % (self['name'], self['ops'])
+        if self.get('mbs') is not None:
+            res += ' %10.2f MB/s' % self['mbs']
+        for key, val in sorted(self.get('extra', {}).items()):
+            res += ' %s=%s' % (key, val)
+        return res
+
+
+def bench(name, func, number=None, size=None, min_duration=1):
+    '''Time a callable.
+
+    :param number: number of calls, calibrated to last at least min_duration seconds if None
+    :param size: bytes processed per call, to report MB/s
+    :return: Result
+    '''
+    if number is None:
+        number = 1
+        while True:
+            duration = _time(func, number)
+            if duration >= min_duration / 10.0:
+                number = max(1, int(number * min_duration / duration))
+                break
+            number *= 10
+
+    duration = _time(func, number)
+    ops = number / duration if duration else 0
+    mbs = ops * size / 1024 / 1024 if size is not None else None
+    return Result(name=name, number=number, duration=duration, ops=ops, mbs=mbs)
+
+def _time(func, number):
+    time_start = time.time()
+    for i in range(number):
+        func()
+    return time.time() - time_start
+
+def save_results(results, file):
+    path = os.path.dirname(file)
+    if path and not os.path.exists(path):
+        os.makedirs(path)
+    with open(file, 'w') as fd:
+        json.dump({'time': time.time(), 'results': results}, fd, indent=4)
+
+def load_results(file):
+    with open(file) as fd:
+        return json.load(fd)['results']
+
+def compare_results(results, baseline, threshold=0.1):
+    '''Compare results with a baseline.
+
+    :param threshold: relative ops/s decrease considered a regression
+    :return: list of (name, ratio, regression) tuples
+    '''
+    baseline = dict((r['name'], r) for r in baseline)
+    res = []
+    for result in results:
+        ref = baseline.get(result['name'])
+        if not ref or not ref['ops']:
+            continue
+        ratio = result['ops'] / ref['ops']
+        res.append((result['name'], ratio, ratio < 1 - threshold))
+    return res
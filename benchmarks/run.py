@@ -0,0 +1,53 @@
+'''Run the benchmarks.
+
+Usage: python -m benchmarks.run [-s parsers|stream|transport|imports] [-o results.json] [-c baseline.json]
+'''
+import sys
+import optparse
+import logging
+
+from benchmarks.common import save_results, load_results, compare_results
+
+
+SUITES = ('parsers', 'stream', 'transport', 'imports')
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('-s', '--suite', action='append', choices=SUITES,
+            help='suite to run (default: all)')
+    parser.add_option('-o', '--output', help='save results to a JSON file')
+    parser.add_option('-c', '--compare', help='compare results with a baseline JSON file')
+    parser.add_option('-t', '--threshold', type='float', default=0.1,
+            help='relative ops/s decrease considered a regression (default: %default)')
+    options, args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    results = []
+    for suite in options.suite or SUITES:
+        try:
+            module = __import__('benchmarks.bench_%s' % suite, fromlist=['run'])
+            suite_results = module.run()
+        except Exception:
+            logging.exception('failed to run the %s benchmarks', suite)
+            continue
+        for result in suite_results:
+            print result
+            results.append(result)
+
+    if options.output:
+        save_results(results, options.output)
+
+    if options.compare:
+        regressions = 0
+        for name, ratio, regression in compare_results(results,
+                load_results(options.compare), threshold=options.threshold):
+            print '%-40s %+7.1f%%%s' % (name, (ratio - 1) * 100,
+                    ' REGRESSION' if regression else '')
+            regressions += regression
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+'''In-process stand-in servers for the transport benchmarks.
+'''
+import os
+import socket
+import binascii
+import threading
+import subprocess
+import logging
+
+import paramiko
+
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.handlers import FTPHandler
+from pyftpdlib.servers import FTPServer
+
+
+USERNAME = 'bench'
+PASSWORD = binascii.hexlify(os.urandom(16))     # random per run, the SSH server executes commands
+
+logger = logging.getLogger(__name__)
+
+
+class SshServer(paramiko.ServerInterface):
+
+    def check_auth_password(self, username, password):
+        if (username, password) == (USERNAME, PASSWORD):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        def _exec():
+            proc = subprocess.Popen(command, shell=True,
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            channel.sendall(proc.communicate()[0])
+            channel.send_exit_status(proc.returncode)
+            channel.close()
+
+        threading.Thread(target=_exec).start()
+        return True
+
+
+class SftpHandle(paramiko.SFTPHandle):
+
+    def stat(self):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError, e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+
+class SftpServer(paramiko.SFTPServerInterface):
+    '''SFTP server backed by a local directory.
+    '''
+    root = None
+
+    def _path(self, path):
+        return os.path.join(self.root, path.lstrip('/'))
+
+    def _call(self, func, *args):
+        try:
+            func(*args)
+        except OSError, e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    def list_folder(self, path):
+        path = self._path(path)
+        try:
+            res = []
+            for filename in os.listdir(path):
+                attr = paramiko.SFTPAttributes.from_stat(os.stat(os.path.join(path, filename)))
+                attr.filename = filename
+                res.append(attr)
+            return res
+        except OSError, e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._path(path)))
+        except OSError, e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def lstat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.lstat(self._path(path)))
+        except OSError, e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def open(self, path, flags, attr):
+        path = self._path(path)
+        try:
+            fd = os.open(path, flags | getattr(os, 'O_BINARY', 0), 0666)
+        except OSError, e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+        if flags & os.O_WRONLY:
+            mode = 'ab' if flags & os.O_APPEND else 'wb'
+        elif flags & os.O_RDWR:
+            mode = 'a+b' if flags & os.O_APPEND else 'r+b'
+        else:
+            mode = 'rb'
+        handle = SftpHandle(flags)
+        handle.readfile = handle.writefile = os.fdopen(fd, mode)
+        return handle
+
+    def remove(self, path):
+        return self._call(os.remove, self._path(path))
+
+    def rename(self, oldpath, newpath):
+        return self._call(os.rename, self._path(oldpath), self._path(newpath))
+
+    def mkdir(self, path, attr):
+        return self._call(os.mkdir, self._path(path))
+
+    def rmdir(self, path):
+        return self._call(os.rmdir, self._path(path))
+
+
+def _serve_forever(target, name):
+    thread = threading.Thread(target=target, name=name)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+def start_sftp_server(root):
+    '''Start an SSH/SFTP server serving the root directory.
+
+    :return: (host, port)
+    '''
+    host_key = paramiko.RSAKey.generate(2048)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(10)
+    server_cls = type('SftpServer', (SftpServer,), {'root': root})
+
+    def accept():
+        while True:
+            client, addr = sock.accept()
+            transport = paramiko.Transport(client)
+            transport.add_server_key(host_key)
+            transport.set_subsystem_handler('sftp', paramiko.SFTPServer, server_cls)
+            transport.start_server(server=SshServer())
+
+    _serve_forever(accept, 'sftp-server')
+    return sock.getsockname()
+
+def start_ftp_server(root):
+    '''Start an FTP server serving the root directory.
+
+    :return: (host, port)
+    '''
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(USERNAME, PASSWORD, root, perm='elradfmw')
+
+    # FTPHandler is an old-style class on Python 2, type() can't subclass it
+    class FtpHandler(FTPHandler):
+        def ftp_SIZE(self, path):
+            # Allow SIZE in ASCII mode like most servers, Ftp.isfile relies on it
+            current_type, self._current_type = self._current_type, 'i'
+            try:
+                return FTPHandler.ftp_SIZE(self, path)
+            finally:
+                self._current_type = current_type
+
+    FtpHandler.authorizer = authorizer
+    server = FTPServer(('127.0.0.1', 0), FtpHandler)
+    _serve_forever(server.serve_forever, 'ftp-server')
+    return server.address
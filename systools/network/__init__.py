@@ -1,20 +1,25 @@
 import socket
 import logging
 
-import netifaces
-
 from systools.system import popen
 
 
 SOCKET_TIMEOUT = 120
 
-socket.setdefaulttimeout(SOCKET_TIMEOUT)
 logger = logging.getLogger(__name__)
 
 
+def set_socket_timeout(timeout=SOCKET_TIMEOUT):
+    '''Set the process-wide default socket timeout.
+    '''
+    socket.setdefaulttimeout(timeout)
+
+
 def get_ips(with_loopback=False):
     '''Get local IPs.
     '''
+    import netifaces
+
     res = []
     for interface in netifaces.interfaces():
         info = netifaces.ifaddresses(interface).get(netifaces.AF_INET)
@@ -2,6 +2,8 @@ import os
 from ftplib import FTP, error_perm
 import logging
 
+from systools.network import SOCKET_TIMEOUT
+
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +16,7 @@ class Ftp(object):
     def __init__(self, host, username, password, port=21):
         try:
             self.ftp = FTP()
-            self.ftp.connect(host, port)
+            self.ftp.connect(host, port, SOCKET_TIMEOUT)
             self.ftp.login(username, password)
         except Exception, e:
             raise FtpError(str(e))
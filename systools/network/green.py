@@ -0,0 +1,73 @@
+'''Cooperative versions of the network tools, based on gevent.
+
+The sockets and threads used by paramiko, ftplib and smtplib only yield to
+the gevent hub once the standard library is patched, which must happen at the
+very top of the entry point, before any other import:
+
+    from gevent import monkey; monkey.patch_all()
+'''
+import logging
+
+from gevent import monkey
+
+from systools.system.green import CONCURRENCY, popen, imap
+from systools.network import get_ips
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_hosts(ip_range=None, concurrency=CONCURRENCY, timeout=None):
+    '''Get LAN alive hosts, pinging the ranges concurrently.
+    '''
+    if not ip_range:
+        ip_range = ['%s.0/24' % ip.rsplit('.', 1)[0] for ip in get_ips()]
+    elif not isinstance(ip_range, (list, tuple)):
+        ip_range = [ip_range]
+
+    def fping(ip_range_):
+        return popen(['fping', '-a', '-A', '-r1', '-g', ip_range_], timeout=timeout)
+
+    res = []
+    for ip_range_, output, e in imap(fping, ip_range, concurrency=concurrency):
+        if output and output[-1] is not None:
+            res += output[0]
+
+    return list(set(res))
+
+def imap_hosts(func, hosts, cls=None, concurrency=CONCURRENCY, timeout=None):
+    '''Connect to the hosts and apply a function to the clients, with at
+    most concurrency clients open at the same time.
+
+    :param func: callable taking a client
+    :param hosts: list of client parameters dicts
+    :param cls: client class (e.g.: Ftp, Email), defaults to Host
+    :param timeout: timeout of each connection and call (seconds)
+    :return: iterator of (host, result, exception) tuples, in completion order
+    '''
+    if not monkey.is_module_patched('socket'):
+        logger.warning('socket is not patched by gevent, hosts will be processed sequentially')
+    if cls is None:
+        from systools.network.ssh import Host as cls
+
+    def call(host):
+        client = cls(**host)
+        try:
+            return func(client)
+        finally:
+            close = getattr(client, 'close', None)
+            if close:
+                close()
+
+    for host, res, e in imap(call, hosts, concurrency=concurrency, timeout=timeout):
+        if e is not None:
+            logger.error('failed to process host %s: %s', host.get('host'), str(e))
+        yield host, res, e
+
+def run_hosts(cmd, hosts, concurrency=CONCURRENCY, timeout=None, **kwargs):
+    '''Run a command on the hosts.
+
+    :return: iterator of (host, (stdout, return code), exception) tuples
+    '''
+    return imap_hosts(lambda client: client.run(cmd, **kwargs), hosts,
+            concurrency=concurrency, timeout=timeout)
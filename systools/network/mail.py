@@ -3,6 +3,8 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import logging
 
+from systools.network import SOCKET_TIMEOUT
+
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +12,7 @@ logger = logging.getLogger(__name__)
 class Email(object):
 
     def __init__(self, host, username, password, port):
-        self.server = smtplib.SMTP(host, port)
+        self.server = smtplib.SMTP(host, port, timeout=SOCKET_TIMEOUT)
         self.server.ehlo()
         self.server.starttls()
         self.server.ehlo()
@@ -24,3 +26,9 @@ class Email(object):
         msg.attach(MIMEText(body, mime_type))
         text = msg.as_string()
         self.server.sendmail(from_addr, to_addr, text)
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:
+            pass
@@ -1,5 +1,6 @@
 import os
 import re
+import socket
 from operator import itemgetter
 from stat import S_ISREG, S_ISDIR
 import logging
@@ -8,7 +9,10 @@ import paramiko
 
 from sshex import Ssh, AuthenticationError, TimeoutError, SshError
 
-from systools.system import PATH_UUIDS, parse_ifconfig, parse_diskutil
+from systools.network import SOCKET_TIMEOUT
+from systools.system import (PATH_UUIDS, parse_ifconfig, parse_ip_json,
+        parse_diskutil)
+from systools.system.service import StatusCache, get_status
 
 
 RE_SIZE = re.compile(r'^([\d\.]+)([bkmg]*)$', re.I)
@@ -22,13 +26,24 @@ class Host(Ssh):
 
     def __init__(self, *args, **kwargs):
         super(Host, self).__init__(*args, **kwargs)
+        self._has_ip_json = None
+        self._services_cache = StatusCache()
 
         # SFTP client
-        self._transport = paramiko.Transport((self.host, self.port))
+        sock = socket.create_connection((self.host, self.port), SOCKET_TIMEOUT)
+        self._transport = paramiko.Transport(sock)
         self._transport.connect(username=self.username, password=self.password)
         self.sftp = paramiko.SFTPClient.from_transport(self._transport)
 
     def __del__(self):
+        self.close()
+
+    def close(self):
+        '''Close the SFTP and SSH connections.
+        '''
+        if getattr(self, '_closed', False):
+            return
+        self._closed = True
         if hasattr(self, '_transport'):
             self._transport.close()
         super(Host, self).__del__()
@@ -146,6 +161,14 @@ class Host(Ssh):
             return stdout[0]
 
     def get_ifconfig(self):
+        # Probe `ip -json` support once per host
+        if self._has_ip_json is not False:
+            output, return_code = self.run('ip -json addr', split_output=False)
+            res = parse_ip_json(output) if return_code == 0 else None
+            self._has_ip_json = res is not None
+            if res is not None:
+                return res
+
         stdout = self.run('ifconfig')[0]
         if not stdout:
             return []
@@ -222,6 +245,13 @@ class Host(Ssh):
         if len(sizes) == 3:
             return sizes[-1]
 
+    def get_services_status(self, svcs):
+        '''Get the running status of the services.
+
+        :return: dict {service: running}
+        '''
+        return get_status(svcs, run=self.run, cache=self._services_cache)
+
     def command_exists(self, cmd):
         if self.run('type -P %s' % cmd)[-1] == 0:
             return True
@@ -26,13 +26,52 @@ class AutoVPN(object):
         self.on_disconnect = on_disconnect
         self.failed_attempts = 0
         self.bus = dbus.SystemBus()
-        self.get_network_manager().connect_to_signal('StateChanged', self.onNetworkStateChanged)
+        self._connections = None    # {connection path: settings}
+        self._active_connections = None
+        self.bus.watch_name_owner(NM, self.onNameOwnerChanged)
+        nm = self.get_network_manager()
+        nm.connect_to_signal('StateChanged', self.onNetworkStateChanged)
+        nm.connect_to_signal('PropertiesChanged', self.onPropertiesChanged)
+        self.bus.add_signal_receiver(self.onDBusPropertiesChanged,
+                'PropertiesChanged', 'org.freedesktop.DBus.Properties', NM,
+                '/org/freedesktop/NetworkManager', arg0=NM)
+        settings = self.get_settings()
+        settings.connect_to_signal('NewConnection', self.onNewConnection)
+        settings.connect_to_signal('ConnectionRemoved', self.onConnectionRemoved)
+        self.bus.add_signal_receiver(self.onConnectionUpdated, 'Updated',
+                NM + '.Settings.Connection', NM, path_keyword='path')
         self.activate_vpn()
 
     def onNetworkStateChanged(self, state):
         if state == 70:
             self.activate_vpn()
 
+    def onNameOwnerChanged(self, owner):
+        # NetworkManager (re)started: object paths are renumbered
+        self._connections = None
+        self._active_connections = None
+
+    def onPropertiesChanged(self, properties):
+        if 'ActiveConnections' in properties:
+            self._active_connections = list(properties['ActiveConnections'])
+
+    def onDBusPropertiesChanged(self, interface, changed, invalidated):
+        if 'ActiveConnections' in invalidated:
+            self._active_connections = None
+        self.onPropertiesChanged(changed)
+
+    def onNewConnection(self, path):
+        if self._connections is not None:
+            self._connections[path] = self._get_connection_settings(path)
+
+    def onConnectionRemoved(self, path):
+        if self._connections is not None:
+            self._connections.pop(path, None)
+
+    def onConnectionUpdated(self, path=None):
+        if self._connections is not None and path:
+            self._connections[path] = self._get_connection_settings(path)
+
     def onVpnStateChanged(self, state, reason):
         if state == 5:  # connected
             self.failed_attempts = 0
@@ -58,27 +97,52 @@ class AutoVPN(object):
         proxy = self.bus.get_object(NM, '/org/freedesktop/NetworkManager')
         return dbus.Interface(proxy, NM)
 
+    def get_settings(self):
+        '''Get the network manager settings dbus interface.
+        '''
+        proxy = self.bus.get_object(NM, '/org/freedesktop/NetworkManager/Settings')
+        return dbus.Interface(proxy, NM + '.Settings')
+
+    def _get_connection_settings(self, con):
+        proxy = self.bus.get_object(NM, con)
+        iface = dbus.Interface(proxy, NM + '.Settings.Connection')
+        return iface.GetSettings()['connection']
+
+    def get_connections(self):
+        '''Get the saved connections settings, cached and updated
+        from the settings signals.
+        '''
+        if self._connections is None:
+            self._connections = dict((con, self._get_connection_settings(con))
+                    for con in self.get_settings().ListConnections())
+        return self._connections
+
+    def get_vpn_connection(self, name):
+        '''Get the path and UUID of the VPN connection with the specified name.
+        '''
+        for con, con_settings in self.get_connections().items():
+            if con_settings['type'] == 'vpn' and con_settings['id'] == name:
+                return con, con_settings['uuid']
+        return None, None
+
     def get_vpn_interface(self, name):
         '''Get the VPN connection interface with the specified name.
         '''
-        proxy = self.bus.get_object(NM, '/org/freedesktop/NetworkManager/Settings')
-        iface = dbus.Interface(proxy, NM + '.Settings')
-        for con in iface.ListConnections():
+        con = self.get_vpn_connection(name)[0]
+        if con is not None:
             proxy = self.bus.get_object(NM, con)
-            iface = dbus.Interface(proxy, NM + '.Settings.Connection')
-            con_settings = iface.GetSettings()['connection']
-            if con_settings['type'] == 'vpn' and con_settings['id'] == name:
-                return iface
+            return dbus.Interface(proxy, NM + '.Settings.Connection')
         logger.error('failed to acquire "%s" VPN interface', name)
 
     def get_active_connection(self):
-        '''Get the dbus interface of the first active network connection.
+        '''Get the dbus path of the first active network connection.
         '''
-        proxy = self.bus.get_object(NM, '/org/freedesktop/NetworkManager')
-        iface = dbus.Interface(proxy, 'org.freedesktop.DBus.Properties')
-        active = iface.Get(NM, 'ActiveConnections')
-        if active:
-            return active[0]
+        if self._active_connections is None:
+            proxy = self.bus.get_object(NM, '/org/freedesktop/NetworkManager')
+            iface = dbus.Interface(proxy, 'org.freedesktop.DBus.Properties')
+            self._active_connections = list(iface.Get(NM, 'ActiveConnections'))
+        if self._active_connections:
+            return self._active_connections[0]
         logger.error('no active connection')
 
     def bind_interface(self, con):
@@ -87,8 +151,9 @@ class AutoVPN(object):
         iface.connect_to_signal('VpnStateChanged', self.onVpnStateChanged)
 
     def activate_vpn(self):
-        vpn_con = self.get_vpn_interface(self.vpn_name)
+        vpn_con, uuid = self.get_vpn_connection(self.vpn_name)
         if vpn_con is None:
+            logger.error('failed to acquire "%s" VPN connection', self.vpn_name)
             return
         active_con = self.get_active_connection()
         if active_con is None:
@@ -98,7 +163,6 @@ class AutoVPN(object):
         iface = dbus.Interface(proxy, 'org.freedesktop.DBus.Properties')
 
         # Check VPN state
-        uuid = vpn_con.GetSettings()['connection']['uuid']
         if iface.Get(NM + '.Connection.Active', 'Uuid') == uuid:
             state = iface.Get(NM + '.VPN.Connection', 'VpnState')
             if state == 5:  # connected
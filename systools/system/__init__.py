@@ -7,14 +7,14 @@ from functools import wraps
 import signal
 import inspect
 from operator import itemgetter
-import imp
+import pkgutil
+import json
 import logging
 
-from lxml import etree
-
 
 PATH_UUIDS = '/dev/disk/by-uuid'
 RE_HWADDR = re.compile(r'\b(%s)\b' % ':'.join(['[0-9a-f]{2}'] * 6), re.I)
+RE_MTU = re.compile(r'\bmtu[:\s]+(\d+)', re.I)
 
 logger = logging.getLogger(__name__)
 
@@ -116,27 +116,81 @@ def parse_ifconfig(output):
         lsplit = line.split()
         if line and line[0] not in (' ', '\t'):
             ifname = lsplit[0].split(':')[0]
-            info.setdefault(ifname, {})
+            info.setdefault(ifname, {'ips': [], 'ips6': []})
 
         if ifname:
             res = RE_HWADDR.search(line)
             if res:
                 info[ifname]['hwaddr'] = res.group(1)
 
+            res = RE_MTU.search(line)
+            if res:
+                info[ifname]['mtu'] = int(res.group(1))
+
             if len(lsplit) > 1 and lsplit[0] == 'inet':
-                info[ifname]['ip'] = lsplit[1].split(':')[-1]
+                info[ifname]['ips'].append(lsplit[1].split(':')[-1])
+            elif len(lsplit) > 1 and lsplit[0] == 'inet6':
+                addr = lsplit[2] if lsplit[1] == 'addr:' and len(lsplit) > 2 else lsplit[1]
+                info[ifname]['ips6'].append(addr.split('/')[0])
 
     res = []
     for ifname, data in info.items():
         if data.get('hwaddr'):
             res.append({
                     'ifname': ifname,
-                    'ip': data.get('ip'),
+                    'ip': data['ips'][0] if data['ips'] else None,
                     'hwaddr': data['hwaddr'],
+                    'ips': data['ips'],
+                    'ips6': data['ips6'],
+                    'mtu': data.get('mtu'),
+                    'state': None,
                     })
     return sorted(res, key=itemgetter('ifname'))
 
+def parse_ip_json(output):
+    '''Parse the output of `ip -json addr`.
+
+    Return the same items as parse_ifconfig(), with the operational state
+    of each interface, or None if the output is not valid.
+    '''
+    if isinstance(output, (list, tuple)):
+        output = '\n'.join(output)
+    try:
+        interfaces = json.loads(output)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(interfaces, list) \
+            or not all(isinstance(d, dict) for d in interfaces):
+        return None
+
+    res = []
+    for data in interfaces:
+        # Skip interfaces without a MAC address (loopback, tunnels...)
+        # like parse_ifconfig()
+        hwaddr = data.get('address')
+        if not hwaddr or not RE_HWADDR.match(hwaddr) \
+                or data.get('link_type') == 'loopback':
+            continue
+        ips, ips6 = [], []
+        for addr in data.get('addr_info', []):
+            if addr.get('family') == 'inet':
+                ips.append(addr['local'])
+            elif addr.get('family') == 'inet6':
+                ips6.append(addr['local'])
+        res.append({
+                'ifname': data['ifname'],
+                'ip': ips[0] if ips else None,
+                'hwaddr': hwaddr,
+                'ips': ips,
+                'ips6': ips6,
+                'mtu': data.get('mtu'),
+                'state': data.get('operstate'),
+                })
+    return sorted(res, key=itemgetter('ifname'))
+
 def parse_diskutil(output, type='list'):
+    from lxml import etree
+
     dict_ = etree.fromstring(output)[0]
 
     if type == 'list':
@@ -161,7 +215,12 @@ def parse_diskutil(output, type='list'):
 
 def get_package_modules(package_name):
     res = []
-    file, path, description = imp.find_module(package_name)
+    loader = pkgutil.get_loader(package_name)
+    if loader is None:
+        raise ImportError('No module named %s' % package_name)
+    path = getattr(loader, 'filename', None)
+    if path is None:
+        path = os.path.dirname(loader.get_filename())
     for module in os.listdir(path):
         filename, ext = os.path.splitext(module)
         if ext.lower() == '.py':
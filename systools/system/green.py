@@ -0,0 +1,73 @@
+'''Cooperative versions of the system tools, based on gevent.
+'''
+import logging
+
+import gevent
+from gevent import subprocess
+from gevent.pool import Pool
+
+
+CONCURRENCY = 100
+
+logger = logging.getLogger(__name__)
+
+
+def popen(cmd, cwd=None, shell=False, timeout=None):
+    '''Execute a command without blocking the other greenlets.
+
+    The process is killed when the timeout is reached or the calling greenlet
+    is killed.
+
+    :param timeout: timeout (seconds)
+    :return: tuple (stdout, stderr, return code)
+    '''
+    if not shell and not isinstance(cmd, (list, tuple)):
+        cmd = cmd.split()
+
+    try:
+        proc = subprocess.Popen(cmd,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                cwd=cwd, shell=shell)
+    except Exception, e:
+        logger.exception('failed to execute command "%s": %s', ' '.join(cmd), str(e))
+        return None, None, None
+
+    timeout_ = gevent.Timeout(timeout)
+    timeout_.start()
+    try:
+        stdout, stderr = proc.communicate()
+        return stdout.splitlines(), stderr.splitlines(), proc.returncode
+    except gevent.Timeout, e:
+        proc.kill()
+        proc.wait()
+        if e is not timeout_:
+            raise
+        logger.error('command "%s" timed out after %s seconds', ' '.join(cmd), timeout)
+        return None, None, None
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        timeout_.cancel()
+
+def imap(func, items, concurrency=CONCURRENCY, timeout=None):
+    '''Apply a function to the items in a bounded pool of greenlets.
+
+    :param concurrency: maximum number of simultaneous calls
+    :param timeout: timeout of each call (seconds)
+    :return: iterator of (item, result, exception) tuples, in completion order
+    '''
+    def call(item):
+        try:
+            with gevent.Timeout(timeout):
+                return item, func(item), None
+        except (Exception, gevent.Timeout), e:
+            return item, None, e
+
+    pool = Pool(concurrency)
+    try:
+        for res in pool.imap_unordered(call, items):
+            yield res
+    finally:
+        pool.kill()
@@ -1,4 +1,5 @@
 import re
+import time
 import logging
 
 from systools.system import popen
@@ -8,25 +9,128 @@ RE_SERVICE = {
     'start': re.compile(r'\brunning\b', re.I),
     'stop': re.compile(r'\b(unrecognized|unknown instance|not running)\b', re.I),
     }
+STATUS_TTL = 5
 
 logger = logging.getLogger(__name__)
 
 
-def _service(svc, param):
-    cmd = 'service %s %s' % (svc, param)
+class StatusCache(object):
+
+    def __init__(self):
+        self.status = {}    # {service: (expiration time, running)}
+        self.systemd = None
+
+
+_cache = StatusCache()
+
+
+def _run(cmd, with_stderr=True):
     stdout, stderr, returncode = popen(cmd)
-    return ' '.join((stdout or []) + (stderr or [])), returncode
+    output = stdout or []
+    if with_stderr:
+        output += stderr or []
+    return output, returncode
+
+def _run_stdout(cmd):
+    return _run(cmd, with_stderr=False)
+
+def _service(svc, param, run=None):
+    cmd = 'service %s %s' % (svc, param)
+    output, returncode = (run or _run)(cmd)
+    return ' '.join(output or []), returncode
 
 def _set_service(svc, status):
+    invalidate(svc)
     output, returncode = _service(svc, status)
     if returncode == 0 or RE_SERVICE[status].search(output):
         return True
     logger.error('failed to %s service %s: %s', status, svc, output)
     return False
 
+def _has_systemd(run, cache):
+    if cache.systemd is None:
+        cache.systemd = run('systemctl --no-pager --version')[-1] == 0
+    return cache.systemd
+
+def _get_systemd_status(svcs, run):
+    '''Get the services status with a single systemctl call.
+    '''
+    output, returncode = run('systemctl --no-pager show -p ActiveState,SubState %s' % ' '.join(svcs))
+    if returncode != 0 or not output:
+        return None
+
+    # Properties are listed in the services order, separated by empty lines
+    states = [{}]
+    for line in output:
+        line = line.strip()
+        if not line:
+            if states[-1]:
+                states.append({})
+            continue
+        key, sep, val = line.partition('=')
+        if sep:
+            states[-1][key] = val
+    states = [s for s in states if s]
+    if len(states) != len(svcs):
+        return None
+    # Same semantics as the "running" status regex: active oneshot
+    # or exited units are not running
+    return dict((svc, state.get('ActiveState') == 'active'
+                and state.get('SubState') == 'running')
+            for svc, state in zip(svcs, states))
+
+def get_status(svcs, run=None, cache=None, ttl=STATUS_TTL):
+    '''Get the running status of services, querying systemd once for
+    all the services not already cached.
+
+    :param run: callable returning a command (output, return code), defaults to local execution
+    :param cache: StatusCache, defaults to the local shared cache
+    :param ttl: status cache time to live (seconds)
+    :return: dict {service: running}
+    '''
+    # systemctl show is parsed from stdout only, warnings go to stderr
+    systemd_run = run or _run_stdout
+    run = run or _run
+    if cache is None:
+        cache = _cache
+
+    res = {}
+    now = time.time()
+    missing = []
+    for svc in svcs:
+        entry = cache.status.get(svc)
+        if entry and entry[0] > now:
+            res[svc] = entry[1]
+        else:
+            missing.append(svc)
+
+    if missing:
+        status = None
+        if _has_systemd(run, cache):
+            status = _get_systemd_status(missing, systemd_run)
+        if status is None:
+            status = {}
+            for svc in missing:
+                output, returncode = _service(svc, 'status', run=run)
+                status[svc] = RE_SERVICE['start'].search(output) is not None
+        for svc, running in status.items():
+            cache.status[svc] = now + ttl, running
+        res.update(status)
+
+    return res
+
+def invalidate(svc=None, cache=None):
+    '''Remove a service or all the services from the status cache.
+    '''
+    if cache is None:
+        cache = _cache
+    if svc is None:
+        cache.status.clear()
+    else:
+        cache.status.pop(svc, None)
+
 def is_running(svc):
-    output, returncode = _service(svc, 'status')
-    return RE_SERVICE['start'].search(output) is not None
+    return get_status([svc])[svc]
 
 def start(svc):
     return _set_service(svc, 'start')
@@ -42,3 +146,14 @@ def check_service(svc, do_start=True):
         logger.info('started %s service', svc)
         return True
     return False
+
+def check_services(svcs, do_start=True):
+    '''Check several services with a single status query.
+
+    :return: dict {service: running}
+    '''
+    res = get_status(svcs)
+    for svc, running in res.items():
+        if not running:
+            res[svc] = check_service(svc, do_start=do_start)
+    return res
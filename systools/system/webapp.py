@@ -1,59 +1,164 @@
 from datetime import datetime, date, timedelta
 from functools import update_wrapper
+from collections import OrderedDict
+from threading import Lock
+import time
 import calendar
+import hashlib
+import zlib
 import json
+import multiprocessing
+import logging
 
 from bson.objectid import ObjectId
 
-from flask import request, make_response, current_app
+from flask import (request, make_response, current_app, Response,
+        stream_with_context)
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+
+JSON_BACKENDS = {'json': json}
+# Backend dump options producing the same output as the json module
+JSON_BACKEND_OPTIONS = {'json': {}}
+if simplejson is not None:
+    JSON_BACKENDS['simplejson'] = simplejson
+    JSON_BACKEND_OPTIONS['simplejson'] = {
+        'namedtuple_as_object': False,
+        'use_decimal': False,
+        'allow_nan': True,
+        }
+DEFAULT_JSON_BACKEND = 'simplejson' if simplejson is not None else 'json'
+STREAM_CHUNK_SIZE = 1000
+CACHE_TTL = 60
+CACHE_MAX_SIZE = 1000
+CACHE_BYPASS_HEADERS = ('Authorization', 'Cookie')
+CACHE_SKIP_HEADERS = ('connection', 'keep-alive', 'proxy-authenticate',
+        'proxy-authorization', 'te', 'trailer', 'trailers', 'transfer-encoding',
+        'upgrade', 'content-length', 'etag')
+WORKER_THREADS = 4
+KEEPALIVE = 5
+
+logger = logging.getLogger(__name__)
+
+
+def encode_default(obj):
+    if isinstance(obj, (datetime, date)):
+        return int(calendar.timegm(obj.timetuple()))
+    elif isinstance(obj, ObjectId):
+        return str(obj)
+    elif isinstance(obj, set):
+        return list(obj)
+    raise TypeError('%r is not JSON serializable' % obj)
 
 
 class JSONEncoder(json.JSONEncoder):
 
     def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return int(calendar.timegm(obj.timetuple()))
-        elif isinstance(obj, ObjectId):
-            return str(obj)
-        elif isinstance(obj, set):
-            return list(obj)
-        return json.JSONEncoder.default(self, obj)
+        try:
+            return encode_default(obj)
+        except TypeError:
+            return json.JSONEncoder.default(self, obj)
+
+
+OBJECT_ID_FIELDS = ('_id', 'user', 'org', 'cust')
+OBJECT_ID_LIST_FIELDS = ('users',)
+TIMESTAMP_FIELDS = ('created', 'modified', 'last_login')
+
+
+def _to_object_id(val):
+    if val is not None:
+        return ObjectId(val)
+    return val
 
+def _to_object_id_list(val):
+    if isinstance(val, list):
+        return [ObjectId(k) for k in val]
+    return val
 
-def json_decoder(obj):
-    for key, val in obj.items():
-        if key in ('_id', 'user', 'org', 'cust'):
-            if val is not None:
-                val = ObjectId(val)
-        elif key in ('users',):
-            if isinstance(val, list):
-                val = [ObjectId(k) for k in val]
-        elif key in ('created', 'modified', 'last_login',):
-            if isinstance(val, (float, int)):
-                val = datetime.utcfromtimestamp(val)
+def _to_datetime(val):
+    if isinstance(val, (float, int)):
+        return datetime.utcfromtimestamp(val)
+    return val
 
-        obj[key] = val
+def get_json_decoder(object_ids=OBJECT_ID_FIELDS,
+        object_id_lists=OBJECT_ID_LIST_FIELDS, timestamps=TIMESTAMP_FIELDS,
+        converters=None):
+    '''Get a json object_hook converting the specified fields.
 
-    return obj
+    :param object_ids: fields to convert to ObjectId
+    :param object_id_lists: fields to convert to a list of ObjectId
+    :param timestamps: fields to convert from a UTC timestamp to datetime
+    :param converters: dict of additional field converters
+    '''
+    table = {}
+    for keys, converter in ((object_ids, _to_object_id),
+            (object_id_lists, _to_object_id_list),
+            (timestamps, _to_datetime)):
+        for key in keys:
+            table[key] = converter
+    table.update(converters or {})
+    table = table.items()
+
+    def decoder(obj):
+        for key, converter in table:
+            if key in obj:
+                obj[key] = converter(obj[key])
+        return obj
+
+    return decoder
+
+json_decoder = get_json_decoder()
 
 
 class JSONSerializer(object):
 
+    def __init__(self, object_hook=json_decoder, backend=None):
+        '''
+        :param object_hook: decoder object_hook, see get_json_decoder()
+        :param backend: encoder backend name from JSON_BACKENDS,
+            defaults to the C-accelerated simplejson if available
+        '''
+        backend = backend or DEFAULT_JSON_BACKEND
+        self.object_hook = object_hook
+        self.backend = JSON_BACKENDS[backend]
+        self.options = dict(JSON_BACKEND_OPTIONS[backend], default=encode_default)
+
     def encode(self, obj, fd=None):
         try:
             if fd:
-                return json.dump(obj, fd, cls=JSONEncoder)
+                return self.backend.dump(obj, fd, **self.options)
             else:
-                return json.dumps(obj, cls=JSONEncoder)
+                return self.backend.dumps(obj, **self.options)
         except (TypeError, ValueError), e:
             raise Exception(str(e))
 
+    def iter_encode(self, items, chunk_size=STREAM_CHUNK_SIZE):
+        '''Encode an iterable (e.g.: a list or a cursor) as a JSON list,
+        yielding a string every chunk_size items.
+        '''
+        chunk = []
+        prefix = '['
+        for item in items:
+            chunk.append(self.encode(item))
+            if len(chunk) >= chunk_size:
+                yield prefix + ', '.join(chunk)
+                chunk = []
+                prefix = ', '
+        if chunk:
+            yield prefix + ', '.join(chunk) + ']'
+        else:
+            yield '[]' if prefix == '[' else ']'
+
     def decode(self, msg=None, fd=None):
         try:
             if msg:
-                return json.loads(msg, object_hook=json_decoder)
+                return json.loads(msg, object_hook=self.object_hook)
             elif fd:
-                return json.load(fd, object_hook=json_decoder)
+                return json.load(fd, object_hook=self.object_hook)
         except (TypeError, ValueError), e:
             raise Exception(str(e))
 
@@ -61,6 +166,12 @@ class JSONSerializer(object):
 def serialize(obj):
     return JSONSerializer().encode(obj)
 
+def stream(items, chunk_size=STREAM_CHUNK_SIZE):
+    '''Get a chunked response encoding the items incrementally.
+    '''
+    gen = JSONSerializer().iter_encode(items, chunk_size=chunk_size)
+    return Response(stream_with_context(gen), mimetype='application/json')
+
 def crossdomain(origin=None, methods=None, headers=None, max_age=21600,
         attach_to_all=True, automatic_options=True):
     if methods is not None:
@@ -72,73 +183,244 @@ def crossdomain(origin=None, methods=None, headers=None, max_age=21600,
     if isinstance(max_age, timedelta):
         max_age = max_age.total_seconds()
 
-    def get_methods():
-        if methods is not None:
-            return methods
-
-        options_resp = current_app.make_default_options_response()
-        return options_resp.headers['allow']
+    cache = {}
+
+    def get_headers():
+        '''Get the allowed methods and the CORS headers, computed once
+        per URL rule.
+        '''
+        key = request.url_rule.rule
+        res = cache.get(key)
+        if res is None:
+            options_resp = current_app.make_default_options_response()
+            allow = options_resp.headers['allow']
+            res = cache[key] = allow, [
+                ('Access-Control-Allow-Origin', origin),
+                ('Access-Control-Allow-Methods', methods if methods is not None else allow),
+                ('Access-Control-Max-Age', str(max_age)),
+                # ('Access-Control-Allow-Headers', headers),
+                ('Access-Control-Allow-Headers', 'Origin, X-Requested-With, Content-Type, Accept'),
+                ]
+        return res
 
     def decorator(f):
         def wrapped_function(*args, **kwargs):
             if automatic_options and request.method == 'OPTIONS':
-                resp = current_app.make_default_options_response()
-            else:
-                resp = make_response(f(*args, **kwargs))
+                # Preflight: answer directly from the cached headers
+                allow, headers_ = get_headers()
+                resp = current_app.response_class()
+                resp.headers['Allow'] = allow
+                resp.headers.extend(headers_)
+                return resp
+
+            resp = make_response(f(*args, **kwargs))
             if not attach_to_all and request.method != 'OPTIONS':
                 return resp
 
             h = resp.headers
-
-            h['Access-Control-Allow-Origin'] = origin
-            h['Access-Control-Allow-Methods'] = get_methods()
-            h['Access-Control-Max-Age'] = str(max_age)
-            # if headers is not None:
-            #     h['Access-Control-Allow-Headers'] = headers
-
-            h['Access-Control-Allow-Headers'] = 'Origin, X-Requested-With, Content-Type, Accept'
+            for key, val in get_headers()[1]:
+                h[key] = val
             return resp
 
         f.provide_automatic_options = False
         return update_wrapper(wrapped_function, f)
     return decorator
 
-def run(app, host='0.0.0.0', port=8000):
-    try:
-        from gunicorn.app.base import Application
-
-        class GunicornApp(Application):
-
-            def __init__(self, options={}):
-                '''__init__ method
+class LRUCache(object):
+    '''Thread-safe LRU cache with a per-entry TTL.
+    '''
+
+    def __init__(self, max_size=CACHE_MAX_SIZE, ttl=CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, val = self._data.pop(key)
+            except KeyError:
+                return None
+            if expires < time.time():
+                return None
+            self._data[key] = expires, val
+            return val
+
+    def set(self, key, val, ttl=None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = expires, val
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def _gzip(data, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+def _is_cacheable(resp):
+    if resp.status_code != 200 or resp.is_streamed or 'Set-Cookie' in resp.headers:
+        return False
+    cache_control = resp.cache_control
+    return not (cache_control.private or cache_control.no_store)
+
+def cache_response(ttl=CACHE_TTL, max_size=CACHE_MAX_SIZE, headers=None,
+        gzip=False):
+    '''Cache the successful GET responses of the decorated view.
+
+    Cached responses get an ETag and matching If-None-Match requests get a 304
+    without calling the view. Requests with credentials (Authorization or
+    Cookie headers) bypass the cache unless these headers are part of the key.
+    Place it below crossdomain().
+
+    :param ttl: entry time to live (seconds)
+    :param max_size: maximum number of entries
+    :param headers: request headers added to the cache key
+    :param gzip: store a gzipped copy of the body, served to clients accepting it
+    '''
+    headers = tuple(headers or ())
+    bypass_headers = [h for h in CACHE_BYPASS_HEADERS
+            if h.lower() not in [k.lower() for k in headers]]
+    vary = list(headers)
+    if gzip:
+        vary.append('Accept-Encoding')
 
-                Load the base config and assign some core attributes.
-                '''
-                self.usage = None
-                self.callable = None
-                self.prog = None
-                self.options = options
-                self.do_load_config()
+    def decorator(f):
+        cache = LRUCache(max_size=max_size, ttl=ttl)
 
-            def init(self, *args):
-                '''init method
+        def wrapped_function(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') \
+                    or any(h in request.headers for h in bypass_headers):
+                return f(*args, **kwargs)
+
+            key = (request.path,
+                    tuple(sorted(request.args.items(multi=True))),
+                    tuple(request.headers.get(h) for h in headers))
+            entry = cache.get(key)
+            if entry is None:
+                resp = make_response(f(*args, **kwargs))
+                if not _is_cacheable(resp):
+                    return resp
+                body = resp.get_data()
+                etag, weak = resp.get_etag()
+                if etag is None:
+                    etag, weak = hashlib.md5(body).hexdigest(), False
+                entry = {
+                    'etag': etag,
+                    'weak': weak,
+                    'headers': [(k, v) for k, v in resp.headers
+                        if k.lower() not in CACHE_SKIP_HEADERS],
+                    'body': body,
+                    'gzip': _gzip(body) if gzip and 'Content-Encoding' not in resp.headers else None,
+                    }
+                cache.set(key, entry)
+
+            # Each content-coding gets its own validator
+            gzipped = entry['gzip'] is not None and 'gzip' in request.accept_encodings
+            if gzipped:
+                body, etag = entry['gzip'], entry['etag'] + '-gz'
+            else:
+                body, etag = entry['body'], entry['etag']
 
-                Takes our custom options from self.options and creates a config
-                dict which specifies custom settings.
-                '''
-                cfg = {}
-                for k, v in self.options.items():
-                    if k.lower() in self.cfg.settings and v is not None:
-                        cfg[k.lower()] = v
-                return cfg
+            if request.if_none_match.contains_weak(etag):
+                resp = current_app.response_class(status=304, headers=entry['headers'])
+            else:
+                resp = current_app.response_class(body, headers=entry['headers'])
+                if gzipped:
+                    resp.headers['Content-Encoding'] = 'gzip'
 
-            def load(self):
-                return app
+            resp.set_etag(etag, weak=entry['weak'])
+            if vary:
+                resp.vary.update(vary)
+            return resp
 
-        options = {
-            'bind': '%s:%s' % (host, port),
-            }
-        GunicornApp(options).run()
+        wrapped_function.cache = cache
+        return update_wrapper(wrapped_function, f)
+    return decorator
 
+def get_workers(cores=None):
+    '''Get the recommended number of gunicorn workers for the CPU cores.
+    '''
+    if cores is None:
+        try:
+            cores = multiprocessing.cpu_count()
+        except NotImplementedError:
+            cores = 1
+    return cores * 2 + 1
+
+def run(app, host='0.0.0.0', port=8000, workers=None, worker_class='gthread',
+        threads=WORKER_THREADS, keepalive=KEEPALIVE, preload_app=False,
+        max_requests=None, max_requests_jitter=None):
+    '''Run the app with gunicorn or the Flask server if gunicorn is missing.
+
+    :param workers: number of workers, derived from the CPU cores if None
+    :param worker_class: gunicorn worker class ('sync', 'gthread', 'gevent'...),
+        gthread falls back to sync if concurrent.futures is not available
+    :param threads: number of threads per worker (gthread worker class)
+    :param keepalive: keep-alive connections timeout (seconds)
+    :param preload_app: load the app before forking the workers
+    :param max_requests: restart workers after this number of requests
+    :param max_requests_jitter: random jitter added to max_requests
+    '''
+    try:
+        from gunicorn.app.base import Application
     except ImportError:
-        app.run(host=host, port=port)
+        logger.warning('gunicorn is not installed, falling back to the Flask server')
+        app.run(host=host, port=port, threaded=True)
+        return
+
+    class GunicornApp(Application):
+
+        def __init__(self, options={}):
+            '''__init__ method
+
+            Load the base config and assign some core attributes.
+            '''
+            self.usage = None
+            self.callable = None
+            self.prog = None
+            self.options = options
+            self.do_load_config()
+
+        def init(self, *args):
+            '''init method
+
+            Takes our custom options from self.options and creates a config
+            dict which specifies custom settings.
+            '''
+            cfg = {}
+            for k, v in self.options.items():
+                if k.lower() in self.cfg.settings and v is not None:
+                    cfg[k.lower()] = v
+            return cfg
+
+        def load(self):
+            return app
+
+    if worker_class == 'gthread':
+        try:
+            import concurrent.futures
+        except ImportError:
+            # Python 2 needs the futures backport for the gthread worker
+            logger.warning('concurrent.futures is not available, using the sync worker class')
+            worker_class = 'sync'
+
+    options = {
+        'bind': '%s:%s' % (host, port),
+        'workers': workers or get_workers(),
+        'worker_class': worker_class,
+        'threads': threads if worker_class == 'gthread' else None,
+        'keepalive': keepalive,
+        'preload_app': preload_app,
+        'max_requests': max_requests,
+        'max_requests_jitter': max_requests_jitter,
+        }
+    logger.info('starting gunicorn with %s', ', '.join('%s=%s' % (k, v)
+            for k, v in sorted(options.items()) if v is not None))
+    GunicornApp(options).run()
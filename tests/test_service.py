@@ -0,0 +1,94 @@
+import unittest
+
+from systools.system import service
+from systools.system.service import StatusCache, get_status, invalidate
+
+
+class FakeRunner(object):
+
+    def __init__(self, systemd=True, show=None, status=None):
+        self.systemd = systemd
+        self.show = show or []
+        self.status = status or {}
+        self.cmds = []
+
+    def __call__(self, cmd):
+        self.cmds.append(cmd)
+        if cmd.startswith('systemctl --no-pager --version'):
+            return (['systemd 245'], 0) if self.systemd else ([], 127)
+        elif cmd.startswith('systemctl --no-pager show'):
+            return self.show, 0
+        elif cmd.startswith('service '):
+            svc = cmd.split()[1]
+            return [self.status.get(svc, '%s: unrecognized service' % svc)], 0
+        return [], 127
+
+
+class GetStatusTestCase(unittest.TestCase):
+
+    def test_systemd_blocks(self):
+        run = FakeRunner(show=[
+                'ActiveState=active', 'SubState=running', '',
+                'ActiveState=active', 'SubState=exited', '',
+                'ActiveState=inactive', 'SubState=dead', '',
+                ])
+        res = get_status(['a', 'b', 'c'], run=run, cache=StatusCache())
+        self.assertEqual(res, {'a': True, 'b': False, 'c': False})
+        self.assertEqual(run.cmds, [
+                'systemctl --no-pager --version',
+                'systemctl --no-pager show -p ActiveState,SubState a b c',
+                ])
+
+    def test_systemd_ignores_non_property_lines(self):
+        run = FakeRunner(show=[
+                'ActiveState=active', 'SubState=running', '',
+                'Warning: The unit file changed on disk',
+                'ActiveState=active', 'SubState=running',
+                ])
+        res = get_status(['a', 'b'], run=run, cache=StatusCache())
+        self.assertEqual(res, {'a': True, 'b': True})
+
+    def test_systemd_mismatch_fallback(self):
+        run = FakeRunner(show=['ActiveState=active', 'SubState=running'],
+                status={'a': 'a is running', 'b': 'b is stopped'})
+        res = get_status(['a', 'b'], run=run, cache=StatusCache())
+        self.assertEqual(res, {'a': True, 'b': False})
+        self.assertEqual(run.cmds[-2:], ['service a status', 'service b status'])
+
+    def test_no_systemd_fallback(self):
+        run = FakeRunner(systemd=False, status={'a': 'a start/running, process 1'})
+        cache = StatusCache()
+        self.assertEqual(get_status(['a', 'b'], run=run, cache=cache),
+                {'a': True, 'b': False})
+        self.assertFalse(cache.systemd)
+        self.assertFalse([c for c in run.cmds if 'show' in c])
+
+        # The probe runs once per cache
+        get_status(['c'], run=run, cache=cache)
+        self.assertEqual(len([c for c in run.cmds if '--version' in c]), 1)
+
+    def test_ttl(self):
+        run = FakeRunner(show=['ActiveState=active', 'SubState=running'])
+        cache = StatusCache()
+        get_status(['a'], run=run, cache=cache, ttl=60)
+        get_status(['a'], run=run, cache=cache, ttl=60)
+        self.assertEqual(len([c for c in run.cmds if 'show' in c]), 1)
+
+        invalidate('a', cache=cache)
+        get_status(['a'], run=run, cache=cache, ttl=-1)
+        get_status(['a'], run=run, cache=cache, ttl=-1)
+        self.assertEqual(len([c for c in run.cmds if 'show' in c]), 3)
+
+    def test_cached_and_missing(self):
+        run = FakeRunner(show=['ActiveState=active', 'SubState=running'])
+        cache = StatusCache()
+        get_status(['a'], run=run, cache=cache)
+        run.show = ['ActiveState=inactive', 'SubState=dead']
+        self.assertEqual(get_status(['a', 'b'], run=run, cache=cache),
+                {'a': True, 'b': False})
+        self.assertEqual(run.cmds[-1],
+                'systemctl --no-pager show -p ActiveState,SubState b')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import unittest
+
+from systools.system import parse_ifconfig, parse_ip_json
+
+
+IFCONFIG_NET_TOOLS_1 = '''eth0      Link encap:Ethernet  HWaddr 00:11:22:33:44:55
+          inet addr:192.168.1.2  Bcast:192.168.1.255  Mask:255.255.255.0
+          inet6 addr: fe80::211:22ff:fe33:4455/64 Scope:Link
+          UP BROADCAST RUNNING MULTICAST  MTU:1500  Metric:1
+
+lo        Link encap:Local Loopback
+          inet addr:127.0.0.1  Mask:255.0.0.0
+          UP LOOPBACK RUNNING  MTU:65536  Metric:1
+
+tun0      Link encap:UNSPEC  HWaddr 00-00-00-00-00-00-00-00-00-00-00-00-00-00-00-00
+          inet addr:10.8.0.6  P-t-P:10.8.0.5  Mask:255.255.255.255
+'''
+IFCONFIG_NET_TOOLS_2 = '''eth0: flags=4163<UP,BROADCAST,RUNNING,MULTICAST>  mtu 9000
+        inet 10.0.0.2  netmask 255.255.255.0  broadcast 10.0.0.255
+        inet 10.0.0.3  netmask 255.255.255.0  broadcast 10.0.0.255
+        inet6 fe80::1  prefixlen 64  scopeid 0x20<link>
+        ether 02:42:ac:11:00:02  txqueuelen 0  (Ethernet)
+
+lo: flags=73<UP,LOOPBACK,RUNNING>  mtu 65536
+        inet 127.0.0.1  netmask 255.0.0.0
+        loop  txqueuelen 1000  (Local Loopback)
+
+wlan0: flags=4099<UP,BROADCAST,MULTICAST>  mtu 1500
+        ether 02:42:ac:11:00:03  txqueuelen 1000  (Ethernet)
+'''
+IP_JSON = [
+    {'ifname': 'lo', 'mtu': 65536, 'operstate': 'UNKNOWN',
+        'link_type': 'loopback', 'address': '00:00:00:00:00:00',
+        'addr_info': [{'family': 'inet', 'local': '127.0.0.1'}]},
+    {'ifname': 'eth0', 'mtu': 9000, 'operstate': 'UP', 'link_type': 'ether',
+        'address': '02:42:ac:11:00:02', 'addr_info': [
+            {'family': 'inet', 'local': '10.0.0.2'},
+            {'family': 'inet', 'local': '10.0.0.3'},
+            {'family': 'inet6', 'local': 'fe80::1'},
+            ]},
+    {'ifname': 'wlan0', 'mtu': 1500, 'operstate': 'DOWN', 'link_type': 'ether',
+        'address': '02:42:ac:11:00:03', 'addr_info': []},
+    {'ifname': 'sit0', 'mtu': 1480, 'operstate': 'DOWN', 'link_type': 'sit',
+        'address': '0.0.0.0', 'addr_info': []},
+    {'ifname': 'ip6tnl0', 'mtu': 1452, 'operstate': 'DOWN',
+        'link_type': 'tunnel6', 'address': '::', 'addr_info': []},
+    {'ifname': 'tun0', 'mtu': 1500, 'operstate': 'UNKNOWN', 'link_type': 'none',
+        'addr_info': [{'family': 'inet', 'local': '10.8.0.6'}]},
+    ]
+
+
+class ParseIfconfigTestCase(unittest.TestCase):
+
+    def test_net_tools_1(self):
+        self.assertEqual(parse_ifconfig(IFCONFIG_NET_TOOLS_1.splitlines()), [{
+                'ifname': 'eth0',
+                'ip': '192.168.1.2',
+                'hwaddr': '00:11:22:33:44:55',
+                'ips': ['192.168.1.2'],
+                'ips6': ['fe80::211:22ff:fe33:4455'],
+                'mtu': 1500,
+                'state': None,
+                }])
+
+    def test_net_tools_2(self):
+        self.assertEqual(parse_ifconfig(IFCONFIG_NET_TOOLS_2.splitlines()), [{
+                'ifname': 'eth0',
+                'ip': '10.0.0.2',
+                'hwaddr': '02:42:ac:11:00:02',
+                'ips': ['10.0.0.2', '10.0.0.3'],
+                'ips6': ['fe80::1'],
+                'mtu': 9000,
+                'state': None,
+                }, {
+                'ifname': 'wlan0',
+                'ip': None,
+                'hwaddr': '02:42:ac:11:00:03',
+                'ips': [],
+                'ips6': [],
+                'mtu': 1500,
+                'state': None,
+                }])
+
+
+class ParseIpJsonTestCase(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual(parse_ip_json(json.dumps(IP_JSON)), [{
+                'ifname': 'eth0',
+                'ip': '10.0.0.2',
+                'hwaddr': '02:42:ac:11:00:02',
+                'ips': ['10.0.0.2', '10.0.0.3'],
+                'ips6': ['fe80::1'],
+                'mtu': 9000,
+                'state': 'UP',
+                }, {
+                'ifname': 'wlan0',
+                'ip': None,
+                'hwaddr': '02:42:ac:11:00:03',
+                'ips': [],
+                'ips6': [],
+                'mtu': 1500,
+                'state': 'DOWN',
+                }])
+
+    def test_same_items_as_ifconfig(self):
+        keys = ['ifname', 'ip', 'hwaddr', 'ips', 'ips6', 'mtu']
+        res_ip = parse_ip_json(json.dumps(IP_JSON).splitlines())
+        res_ifconfig = parse_ifconfig(IFCONFIG_NET_TOOLS_2.splitlines())
+        self.assertEqual([sorted(r.keys()) for r in res_ip],
+                [sorted(r.keys()) for r in res_ifconfig])
+        self.assertEqual([[r[k] for k in keys] for r in res_ip],
+                [[r[k] for k in keys] for r in res_ifconfig])
+
+    def test_invalid(self):
+        for output in ('', 'Object "-json" is unknown', '{"a": 1}', '[1, 2]', 'null'):
+            self.assertEqual(parse_ip_json(output), None, output)
+        self.assertEqual(parse_ip_json('[]'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
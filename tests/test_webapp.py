@@ -0,0 +1,89 @@
+import unittest
+from collections import namedtuple
+from datetime import datetime
+
+from bson.objectid import ObjectId
+
+from flask import Flask
+
+from systools.system.webapp import crossdomain, JSONSerializer, JSON_BACKENDS
+
+
+def _get_methods(value):
+    return sorted(m.strip() for m in value.split(','))
+
+
+class JSONSerializerTestCase(unittest.TestCase):
+
+    def test_backends_output(self):
+        Point = namedtuple('Point', ['x', 'y'])
+        obj = {
+            'id': ObjectId('5f43a1b2c3d4e5f6a7b8c9d0'),
+            'created': datetime(2020, 1, 1),
+            'tags': set(['a']),
+            'point': Point(1, 2),
+            'nan': float('nan'),
+            'inf': float('inf'),
+            'list': [1, 2.5, None, True, u'\xe9'],
+            }
+        res = dict((backend, JSONSerializer(backend=backend).encode(obj))
+                for backend in JSON_BACKENDS)
+        self.assertEqual(len(set(res.values())), 1, res)
+        self.assertIn('"nan": NaN', res['json'])
+
+    def test_iter_encode(self):
+        serializer = JSONSerializer()
+        for count in (0, 1, 4, 5):
+            items = [{'_id': ObjectId(), 'count': i} for i in range(count)]
+            data = ''.join(serializer.iter_encode(iter(items), chunk_size=2))
+            self.assertEqual(serializer.decode(data), items)
+
+
+class CrossdomainTestCase(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+
+        @app.route('/items/', methods=['GET', 'OPTIONS'])
+        @app.route('/items/<id>', methods=['GET', 'DELETE', 'OPTIONS'])
+        @crossdomain(origin='*')
+        def items(id=None):
+            return 'ok'
+
+        @app.route('/users/', methods=['GET', 'POST', 'OPTIONS'])
+        @crossdomain(origin='*', methods=['GET'])
+        def users():
+            return 'ok'
+
+        self.client = app.test_client()
+
+    def test_preflight_per_rule(self):
+        for i in range(2):
+            resp = self.client.open('/items/', method='OPTIONS')
+            self.assertEqual(_get_methods(resp.headers['Allow']),
+                    ['GET', 'HEAD', 'OPTIONS'])
+            self.assertEqual(_get_methods(resp.headers['Access-Control-Allow-Methods']),
+                    ['GET', 'HEAD', 'OPTIONS'])
+
+            resp = self.client.open('/items/1', method='OPTIONS')
+            self.assertEqual(_get_methods(resp.headers['Allow']),
+                    ['DELETE', 'GET', 'HEAD', 'OPTIONS'])
+            self.assertEqual(_get_methods(resp.headers['Access-Control-Allow-Methods']),
+                    ['DELETE', 'GET', 'HEAD', 'OPTIONS'])
+
+    def test_preflight_explicit_methods(self):
+        resp = self.client.open('/users/', method='OPTIONS')
+        self.assertEqual(_get_methods(resp.headers['Allow']),
+                ['GET', 'HEAD', 'OPTIONS', 'POST'])
+        self.assertEqual(resp.headers['Access-Control-Allow-Methods'], 'GET')
+
+    def test_headers_attached(self):
+        resp = self.client.get('/items/1')
+        self.assertEqual(resp.data, 'ok')
+        self.assertEqual(resp.headers['Access-Control-Allow-Origin'], '*')
+        self.assertEqual(_get_methods(resp.headers['Access-Control-Allow-Methods']),
+                ['DELETE', 'GET', 'HEAD', 'OPTIONS'])
+
+
+if __name__ == '__main__':
+    unittest.main()